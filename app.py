@@ -1,22 +1,38 @@
-import json
+import hashlib
 import os
-from datetime import datetime, timedelta
+import tempfile
+import time
+from contextlib import contextmanager
+from uuid import uuid4
+from datetime import datetime
+from functools import lru_cache
+import orjson # C/SIMD JSON encoder/decoder, faster than the stdlib json module
 from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify # jsonify added
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import numpy as np # Used for efficient array sorting
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.metrics.pairwise import linear_kernel
+import joblib # Ships with scikit-learn; persists the fitted components between restarts
+import numpy as np # Used for efficient top-N selection
+from scipy import sparse # Used to stack/replace rows of the term-count matrix
+try:
+    import fcntl # POSIX only: cross-process lock for the event log
+except ImportError:
+    fcntl = None # e.g. Windows: the log lock becomes a no-op (single-process use)
 
 # --- Configuration ---
 app = Flask(__name__)
 app.secret_key = 'your_super_secret_key'
-EVENT_FILE = 'events_college.json'
+EVENT_FILE = 'events_college.jsonl'
+EVENT_LOCK_FILE = EVENT_FILE + '.lock' # Separate file: EVENT_FILE itself is swapped out by compaction
+AI_CACHE_FILE = 'tfidf.joblib'
+COMPACT_RATIO = 0.3 # Rewrite the log once this share of its lines no longer maps to a live event
 ADMIN_USER = 'admin'
 ADMIN_PASS = 'password123'
 
 # --- Utility Functions and Global Data ---
 
+@lru_cache(maxsize=4096)
 def format_date(date_str):
-    """Formats YYYY-MM-DD date string for display."""
+    """Formats YYYY-MM-DD date string for display (memoized: the same dates are rendered on every page)."""
     try:
         date_obj = datetime.strptime(date_str, "%Y-%m-%d")
         return date_obj.strftime("%B %d, %Y")
@@ -25,127 +41,394 @@ def format_date(date_str):
 
 app.jinja_env.globals.update(format_date=format_date)
 
-def load_events():
-    """Reads events from the JSON file."""
+def read_event_log():
+    """Replays the JSON Lines event log.
+
+    Returns the live events, the number of log lines and how many events had no id yet
+    (those were given a fresh one and need a compaction to persist it).
+    """
+    events_by_id, line_count, fresh_ids = {}, 0, 0
     if os.path.exists(EVENT_FILE):
-        with open(EVENT_FILE, 'r') as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                return []
-    return []
+        with open(EVENT_FILE, 'rb') as f:
+            for line in f:
+                line_count += 1
+                try:
+                    record = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    continue # e.g. a partially written last line
+                if not isinstance(record, dict):
+                    continue # Valid JSON but not a record (e.g. a stray [] line)
+                op = record.get('op')
+                if op is None:
+                    if 'id' not in record:
+                        record['id'] = uuid4().hex
+                        fresh_ids += 1
+                    events_by_id[record['id']] = record
+                elif record.get('id') in events_by_id:
+                    if op == 'edit' and isinstance(record.get('event'), dict):
+                        events_by_id[record['id']] = record['event']
+                    elif op == 'delete':
+                        del events_by_id[record['id']]
+    events = list(events_by_id.values())
+    for e in events:
+        e['_corpus'] = event_corpus(e)
+    return events, line_count, fresh_ids
+
+def load_events():
+    """Reads events from the JSON Lines log."""
+    return read_event_log()[0]
+
+def event_corpus(event):
+    """Builds the text the recommender indexes for an event (cached on the event as '_corpus')."""
+    return f"{event.get('title', '')} {event.get('description', '')} {event.get('venue', '')}"
+
+def strip_private(event):
+    """Returns the event without in-memory '_' keys, i.e. the fields that are written to the log."""
+    return {k: v for k, v in event.items() if not k.startswith('_')}
+
+@contextmanager
+def event_log_lock(optional=False):
+    """Holds an exclusive lock on the event log, shared by every worker process using this directory.
+
+    Yields whether the lock is held. Without fcntl locking is a no-op and counts as held.
+    With optional=True a lock file that cannot be opened (e.g. a read-only deploy directory)
+    yields False instead of raising: the log may still be read, but must not be rewritten.
+    """
+    if fcntl is None:
+        yield True
+        return
+    try:
+        lock = open(EVENT_LOCK_FILE, 'a')
+    except OSError:
+        if not optional:
+            raise
+        yield False
+        return
+    with lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+def temp_file_beside(path):
+    """Creates a uniquely named temp file in the directory of path (so os.replace stays atomic).
+
+    mkstemp creates it as 0600; it gets path's current mode (or the umask default for a new
+    file) so replacing path with it keeps the file readable to whoever could read it before.
+    """
+    fd, tmp_file = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(path)), prefix=os.path.basename(path) + '.', suffix='.tmp'
+    )
+    os.close(fd)
+    try:
+        mode = os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    os.chmod(tmp_file, mode)
+    return tmp_file
+
+def log_version(st):
+    """Identifies one state of the log from its stat result (inode changes on compaction, size on append)."""
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+def log_needs_compaction(line_count, live_count):
+    """True once more than COMPACT_RATIO of the log lines no longer map to a live event."""
+    return line_count - live_count > COMPACT_RATIO * line_count
+
+def append_event_record(record, loaded_version, loaded_lines, live_events):
+    """Appends one record (a new event, or an edit/delete op keyed by event id) to the JSON Lines log.
+
+    loaded_version/loaded_lines describe the log the caller last loaded or wrote, and live_events
+    are its events with this change already applied; they are compacted into the log once too
+    many lines are stale. Returns the log version and line count right after this write, or
+    (None, None) if the log had changed since loaded_version (the caller's events miss another
+    worker's write and must be reloaded).
+    """
+    with event_log_lock(), open(EVENT_FILE, 'a+b') as f:
+        st = os.fstat(f.fileno())
+        version_before = log_version(st)
+        line = orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+        # Terminate a partially written last line first, or this record would be glued onto it
+        if st.st_size > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                line = b'\n' + line
+        f.write(line)
+        f.flush()
+        if version_before != loaded_version:
+            return None, None
+        line_count = loaded_lines + 1
+        if log_needs_compaction(line_count, len(live_events)):
+            save_events(live_events)
+            return log_version(os.stat(EVENT_FILE)), len(live_events)
+        return log_version(os.fstat(f.fileno())), line_count
 
 def save_events(events_list):
-    """Writes the current list of events to the JSON file."""
-    with open(EVENT_FILE, 'w') as f:
-        json.dump(events_list, f, indent=4)
+    """Rewrites the log as one line per event, dropping all edit/delete records (compaction).
 
-def get_ai_components(events_list):
-    """Trains and returns the TF-IDF Vectorizer and Matrix."""
-    if not events_list:
+    Callers must hold event_log_lock() from reading the log until this returns,
+    otherwise records appended in between are lost.
+    """
+    tmp_file = temp_file_beside(EVENT_FILE)
+    try:
+        with open(tmp_file, 'wb') as f:
+            f.write(b''.join(
+                orjson.dumps(strip_private(e), option=orjson.OPT_APPEND_NEWLINE) for e in events_list
+            ))
+        os.replace(tmp_file, EVENT_FILE)
+    except BaseException:
+        os.remove(tmp_file)
+        raise
+
+def parse_event_dates(events_list):
+    """Parses each event's YYYY-MM-DD date once into a datetime64 array (NaT if invalid)."""
+    dates = np.full(len(events_list), np.datetime64('NaT'), dtype='datetime64[D]')
+    for i, e in enumerate(events_list):
+        try:
+            dates[i] = np.datetime64(e['date'], 'D')
+        except (KeyError, TypeError, ValueError):
+            continue
+    return dates
+
+# Stateless hashing: no vocabulary to fit, so a single event can be vectorized on its own
+# float32 halves the bytes moved by the similarity dot product compared to the float64 default
+HASHER = HashingVectorizer(
+    stop_words='english', n_features=2**18, alternate_sign=False, norm=None, dtype=np.float32
+)
+
+def hash_events(events_list):
+    """Hashes the cached event text into a sparse term-count matrix (one row per event)."""
+    corpus = [e['_corpus'] for e in events_list]
+    return HASHER.transform(corpus)
+
+def get_ai_components(term_counts):
+    """Fits the IDF weights on the hashed term counts and returns the TF-IDF transformer and Matrix."""
+    if term_counts is None or term_counts.shape[0] == 0:
         return None, None # Returns None if no data exists
 
-    corpus = [
-        f"{e.get('title', '')} {e.get('description', '')} {e.get('venue', '')}" 
-        for e in events_list
-    ]
-    
-    # Train the model
-    vectorizer = TfidfVectorizer(stop_words='english')
-    tfidf_matrix = vectorizer.fit_transform(corpus)
+    # Only the IDF weights are learned; the text itself is not re-tokenized
+    # sublinear_tf dampens descriptions that repeat the same keyword many times
+    vectorizer = TfidfTransformer(norm='l2', sublinear_tf=True)
+    tfidf_matrix = vectorizer.fit_transform(term_counts)
     return vectorizer, tfidf_matrix
 
+def events_fingerprint(events_list):
+    """Hashes the ordered (id, indexed text) pairs: equal fingerprints mean identical term-count rows."""
+    return hashlib.sha1(orjson.dumps([[e['id'], e['_corpus']] for e in events_list])).hexdigest()
+
+def save_ai_cache(components, fingerprint):
+    """Persists (term counts, transformer, matrix) tagged with the fingerprint of the events they were built from."""
+    # Unique per dump so workers refitting at the same time never write into one file
+    try:
+        tmp_file = temp_file_beside(AI_CACHE_FILE)
+    except OSError:
+        return # e.g. a read-only deploy directory: run without the on-disk cache
+    try:
+        # Uncompressed so it can be memory-mapped; replaced atomically so mapped readers never see a truncated file
+        joblib.dump((*components, fingerprint), tmp_file, compress=0)
+        os.replace(tmp_file, AI_CACHE_FILE)
+    except BaseException:
+        os.remove(tmp_file)
+        raise
+
+def load_ai_cache(fingerprint):
+    """Returns the cached (term counts, transformer, matrix) if they were built from these exact events, else None."""
+    if not os.path.exists(AI_CACHE_FILE):
+        return None
+    try:
+        term_counts, vectorizer, tfidf_matrix, cached_fingerprint = joblib.load(AI_CACHE_FILE, mmap_mode='r')
+    except Exception:
+        return None # Unreadable or outdated cache format: just refit
+    if cached_fingerprint != fingerprint:
+        return None
+    return term_counts, vectorizer, tfidf_matrix
+
 # --- Chatbot Logic (New AI Component) ---
 
+# (keywords, response) rules, checked in priority order; edit this table to change the bot's answers
+CHATBOT_RULES = [
+    (('admin', 'login', 'credentials'),
+     f"The admin username is '{ADMIN_USER}' and the password is '{ADMIN_PASS}'."),
+    (('upcoming', 'next 7 days', 'filter'),
+     "The homepage automatically filters events for the next 7 days in the 'Upcoming Events' section."),
+    (('recommendation', 'search', 'event', 'interested'),
+     "To get personalized recommendations, please use the search bar at the top! I use AI (TF-IDF) for matching."),
+    (('hello', 'hi', 'hey'),
+     "Hello! I'm your College Event Assistant. How can I help you find an event?"),
+]
+
+CHATBOT_DEFAULT = "I'm an AI assistant. I can help with event search, admin access, or the 7-day filter."
+
 def get_chatbot_response(message):
     """Provides rule-based answers based on keywords in the user's message."""
-    message = message.lower()
-    
-    if 'admin' in message or 'login' in message or 'credentials' in message:
-        return f"The admin username is '{ADMIN_USER}' and the password is '{ADMIN_PASS}'."
-    elif 'upcoming' in message or 'next 7 days' in message or 'filter' in message:
-        return "The homepage automatically filters events for the next 7 days in the 'Upcoming Events' section."
-    elif 'recommendation' in message or 'search' in message or 'event' in message or 'interested' in message:
-        return "To get personalized recommendations, please use the search bar at the top! I use AI (TF-IDF) for matching."
-    elif 'hello' in message or 'hi' in message or 'hey' in message:
-        return "Hello! I'm your College Event Assistant. How can I help you find an event?"
-    else:
-        return "I'm an AI assistant. I can help with event search, admin access, or the 7-day filter."
+    message = message.casefold()
+    return next(
+        (response for keywords, response in CHATBOT_RULES if any(k in message for k in keywords)),
+        CHATBOT_DEFAULT
+    )
 
 # --- Recommendation Logic (Simplified) ---
 
-def recommend_events_simple(user_interest, events_list, top_n=3):
-    """Calculates Cosine Similarity and uses simple sorting for Top N."""
-    vectorizer, tfidf_matrix = get_ai_components(events_list)
-    
+def recommend_events_simple(user_interest, events_list, vectorizer, tfidf_matrix, top_n=3):
+    """Calculates Cosine Similarity against the cached matrix and selects the Top N by partitioning."""
     if vectorizer is None:
         return []
 
     # 1. Transform user interest
-    user_tfidf = vectorizer.transform([user_interest])
+    user_tfidf = vectorizer.transform(HASHER.transform([user_interest]))
+    if user_tfidf.nnz == 0:
+        return [] # Only stop words (or no words at all): nothing can match
 
-    # 2. Calculate Cosine Similarity
-    cosine_sim = cosine_similarity(user_tfidf, tfidf_matrix).flatten()
+    # 2. Calculate Cosine Similarity: rows are already L2-normalized, so the linear kernel is enough
+    cosine_sim = linear_kernel(user_tfidf, tfidf_matrix).ravel()
 
-    # 3. Simple O(n log n) sorting to get indices of top scores
-    top_indices = cosine_sim.argsort()[::-1]
-    
-    recommended_events = []
-    
-    # Filter for non-zero scores and collect the top N events
-    for i in top_indices:
-        if cosine_sim[i] > 0.0 and len(recommended_events) < top_n:
-            recommended_events.append(events_list[i])
-        elif len(recommended_events) >= top_n:
-            break
-            
-    return recommended_events
+    # 3. O(n) partition to isolate the top scores, then sort only those k
+    k = min(top_n, cosine_sim.size)
+    top_indices = np.argpartition(cosine_sim, -k)[-k:]
+    top_indices = top_indices[np.argsort(-cosine_sim[top_indices])]
+
+    # Keep only events with a non-zero match
+    top_indices = top_indices[cosine_sim[top_indices] > 0.0]
+
+    return [events_list[i] for i in top_indices]
+
+# --- Shared State ---
+
+class EventState:
+    """Holds all mutable event and model data; the single instance lives in app.config['STATE']."""
+
+    def __init__(self):
+        self.events = []
+        self.events_by_id = {} # Stable event id -> event, same dicts as in events
+        self.row_by_id = {} # Stable event id -> its position in events (and row in counts/matrix)
+        self.event_dates = np.array([], dtype='datetime64[D]') # Parsed dates, aligned with events
+        self.counts = None # Hashed term counts, one row per event (None until built)
+        self.vectorizer = None
+        self.matrix = None
+        self.log_version = None # log_version() of EVENT_FILE matching events (None forces a reload)
+        self.log_lines = 0 # Number of lines in EVENT_FILE at log_version
+        self.ai_dirty = True # Set whenever the events change; cleared by ensure_ai_components
+
+app.config['STATE'] = STATE = EventState()
 
 # --- Flask Routes ---
 
 @app.before_request
 def check_initialization():
-    """Ensures the AI components are always trained on the latest data."""
-    global GLOBAL_EVENTS
-    GLOBAL_EVENTS = load_events()
-    global GLOBAL_VECTORIZER, GLOBAL_MATRIX
-    GLOBAL_VECTORIZER, GLOBAL_MATRIX = get_ai_components(GLOBAL_EVENTS)
+    """Reloads events only when the event log has changed; the AI components are rebuilt lazily."""
+    version = log_version(os.stat(EVENT_FILE)) if os.path.exists(EVENT_FILE) else None
+    if version != STATE.log_version:
+        # Read (and maybe compact) under the lock so no other worker appends in between
+        with event_log_lock(optional=True) as locked:
+            events, line_count, fresh_ids = read_event_log()
+            if locked and (fresh_ids or log_needs_compaction(line_count, len(events))):
+                save_events(events)
+                line_count = len(events)
+            version = log_version(os.stat(EVENT_FILE)) if os.path.exists(EVENT_FILE) else None
+        STATE.events = events
+        STATE.events_by_id = {e['id']: e for e in events}
+        STATE.row_by_id = {e['id']: row for row, e in enumerate(events)}
+        STATE.event_dates = parse_event_dates(events)
+        # Term counts no longer match the events: drop them so ensure_ai_components rebuilds
+        STATE.counts, STATE.vectorizer, STATE.matrix = None, None, None
+        STATE.log_version = version
+        STATE.log_lines = line_count
+        STATE.ai_dirty = True
+
+def ensure_ai_components():
+    """Builds or refits the AI components if the events changed since the last fit (only /recommend needs them)."""
+    if not STATE.ai_dirty:
+        return
+    if STATE.counts is None and STATE.events:
+        # Memory-mapped, so every worker loading the same cache shares one copy of the matrix
+        cached = load_ai_cache(events_fingerprint(STATE.events))
+        if cached is not None:
+            STATE.counts, STATE.vectorizer, STATE.matrix = cached
+            STATE.ai_dirty = False
+            return
+        STATE.counts = hash_events(STATE.events)
+    STATE.vectorizer, STATE.matrix = get_ai_components(STATE.counts)
+    save_ai_cache((STATE.counts, STATE.vectorizer, STATE.matrix), events_fingerprint(STATE.events))
+    STATE.ai_dirty = False
+
+def append_event_row(event):
+    """Hashes a newly added event and stacks it under the existing term counts (if they are built)."""
+    if STATE.counts is not None:
+        STATE.counts = sparse.vstack([STATE.counts, hash_events([event])], format='csr')
+
+def replace_event_row(index, event=None):
+    """Replaces the term counts of the event at index, or removes its row if no event is given."""
+    if STATE.counts is None:
+        return
+    rows = [STATE.counts[:index]]
+    if event is not None:
+        rows.append(hash_events([event]))
+    rows.append(STATE.counts[index + 1:])
+    STATE.counts = sparse.vstack(rows, format='csr')
+
+def log_event_change(record):
+    """Appends the record for a change already applied to STATE.events and tracks the resulting log state.
+
+    A None version (another worker wrote in between) makes the next request reload the log.
+    """
+    STATE.log_version, STATE.log_lines = append_event_record(
+        record, STATE.log_version, STATE.log_lines, STATE.events
+    )
 
-# Define global variables for data storage
-GLOBAL_EVENTS = []
-GLOBAL_VECTORIZER = None
-GLOBAL_MATRIX = None
+def invalidate_cache():
+    """Re-parses dates and marks the AI components for a refit after an admin route changed the events."""
+    STATE.event_dates = parse_event_dates(STATE.events)
+    STATE.ai_dirty = True
+
+def upcoming_window():
+    """Returns (today, today + 7 days) as datetime64[D], recomputed at most once a minute."""
+    global _TODAY, _CUTOFF, _TODAY_STAMP
+    now = time.time()
+    if now - _TODAY_STAMP > 60:
+        today = np.datetime64(datetime.fromtimestamp(now).date(), 'D')
+        if today != _TODAY:
+            _TODAY, _CUTOFF = today, today + np.timedelta64(7, 'D')
+        _TODAY_STAMP = now
+    return _TODAY, _CUTOFF
+
+# Cached clock values for home()
+_TODAY = _CUTOFF = None # Cached bounds of the 7-day window, see upcoming_window
+_TODAY_STAMP = float('-inf') # time.time() of the last rollover check
 
 @app.route('/')
 def home():
-    # 1. Define the current date and the cutoff date (7 days from now).
-    today = datetime.now().date()
-    seven_days_from_now = today + timedelta(days=7) 
+    # 1. Get the current date and the cutoff date (7 days from now).
+    today, seven_days_from_now = upcoming_window()
     
     # 2. Filter events for the Upcoming Events section (next 7 days).
-    upcoming_events = []
-    for e in GLOBAL_EVENTS:
-        try:
-            event_date = datetime.strptime(e['date'], "%Y-%m-%d").date()
-            # Filter Logic: event must be today or later AND within the next 7 days.
-            if event_date >= today and event_date <= seven_days_from_now:
-                upcoming_events.append(e)
-        except ValueError:
-            continue
+    # Filter Logic: event must be today or later AND within the next 7 days (NaT never matches).
+    mask = (STATE.event_dates >= today) & (STATE.event_dates <= seven_days_from_now)
+    upcoming_events = [STATE.events[i] for i in np.nonzero(mask)[0]]
             
     return render_template(
         'index.html', 
         events=upcoming_events, 
-        all_events=GLOBAL_EVENTS,
+        all_events=STATE.events,
         datetime=datetime
     )
 
 @app.route('/recommend', methods=['POST'])
 def recommend():
-    user_interest = request.form['interest']
+    user_interest = request.form.get('interest', '').strip()
+    if not user_interest:
+        # Nothing to search for: skip the model entirely
+        return render_template('recommend.html', recommended=[], interest='')
     
+    # Train or refit the model only if the events changed since the last recommendation
+    ensure_ai_components()
+
     # Call the simplified recommendation function
-    recommended = recommend_events_simple(user_interest, GLOBAL_EVENTS, top_n=5)
+    recommended = recommend_events_simple(
+        user_interest, STATE.events, STATE.vectorizer, STATE.matrix, top_n=5
+    )
     
     return render_template('recommend.html', recommended=recommended, interest=user_interest)
 
@@ -188,10 +471,10 @@ def admin_dashboard():
         flash("Please log in first.", "warning")
         return redirect(url_for('login'))
     
-    # Pass the global event list
+    # Pass the shared event list
     return render_template(
         'admin_dashboard.html', 
-        events=GLOBAL_EVENTS,
+        events=STATE.events,
         datetime=datetime
     )
 
@@ -206,67 +489,82 @@ def add_event():
         return redirect(url_for('admin_dashboard'))
 
     new_event = {
+        "id": uuid4().hex,
         "title": request.form['title'],
         "description": request.form['description'],
         "date": request.form['date'],
         "venue": request.form['venue'],
         "url": request.form['url']
     }
+    new_event['_corpus'] = event_corpus(new_event)
     
-    # Add to global list and save
-    GLOBAL_EVENTS.append(new_event)
-    save_events(GLOBAL_EVENTS)
+    # Add to the shared list and append to the log
+    STATE.events.append(new_event)
+    STATE.events_by_id[new_event['id']] = new_event
+    STATE.row_by_id[new_event['id']] = len(STATE.events) - 1
+    log_event_change(strip_private(new_event))
+    append_event_row(new_event)
+    invalidate_cache()
     flash(f"Event '{new_event['title']}' added successfully!", "success")
     return redirect(url_for('admin_dashboard'))
 
-@app.route('/edit_event/<int:index>', methods=['GET', 'POST'])
-def edit_event(index):
-    """Handles viewing and submitting edits for a specific event by its list index."""
+@app.route('/edit_event/<eid>', methods=['GET', 'POST'])
+def edit_event(eid):
+    """Handles viewing and submitting edits for a specific event by its stable id."""
     if not session.get('logged_in'):
         return redirect(url_for('login'))
 
-    if not (0 <= index < len(GLOBAL_EVENTS)):
+    event_to_edit = STATE.events_by_id.get(eid)
+    if event_to_edit is None:
         flash("Event not found.", "danger")
         return redirect(url_for('admin_dashboard'))
-
-    event_to_edit = GLOBAL_EVENTS[index]
     
     if request.method == 'POST':
         # --- Handle Form Submission (POST Request) ---
         try:
-            # 1. Update the event dictionary with new form data
-            event_to_edit['title'] = request.form['title']
-            event_to_edit['description'] = request.form['description']
-            event_to_edit['date'] = request.form['date']
-            event_to_edit['venue'] = request.form['venue']
-            event_to_edit['url'] = request.form['url']
-
-            # 2. Save the updated global list back to the JSON file
-            save_events(GLOBAL_EVENTS)
-
-            flash(f"Event '{event_to_edit['title']}' updated successfully!", "success")
-            return redirect(url_for('admin_dashboard'))
-        
+            # 1. Read every field first: the cached event must not be left half-updated
+            changes = {
+                field: request.form[field]
+                for field in ('title', 'description', 'date', 'venue', 'url')
+            }
         except KeyError as e:
             flash(f"Missing form field: {e}. Please check your HTML form names.", "danger")
-            return redirect(url_for('edit_event', index=index))
+            return redirect(url_for('edit_event', eid=eid))
+
+        # 2. Update the event dictionary with new form data
+        event_to_edit.update(changes)
+        event_to_edit['_corpus'] = event_corpus(event_to_edit)
+
+        # 3. Log the edit in the JSON Lines file
+        log_event_change({'op': 'edit', 'id': eid, 'event': strip_private(event_to_edit)})
+        replace_event_row(STATE.row_by_id[eid], event_to_edit)
+        invalidate_cache()
+
+        flash(f"Event '{event_to_edit['title']}' updated successfully!", "success")
+        return redirect(url_for('admin_dashboard'))
     
     # --- Handle Page View (GET Request) ---
     return render_template(
         'edit_event.html', 
-        event=event_to_edit,
-        index=index
+        event=event_to_edit
     )
 
-@app.route('/delete_event/<int:index>')
-def delete_event(index):
+@app.route('/delete_event/<eid>')
+def delete_event(eid):
     if not session.get('logged_in'):
         return redirect(url_for('login'))
     
-    if 0 <= index < len(GLOBAL_EVENTS):
-        # Delete from global list and save
-        del GLOBAL_EVENTS[index]
-        save_events(GLOBAL_EVENTS)
+    event_to_delete = STATE.events_by_id.pop(eid, None)
+    if event_to_delete is not None:
+        # Delete from the shared list and log a tombstone
+        index = STATE.row_by_id.pop(eid)
+        del STATE.events[index]
+        # Only the events after the deleted one move up a row
+        for row, e in enumerate(STATE.events[index:], start=index):
+            STATE.row_by_id[e['id']] = row
+        log_event_change({'op': 'delete', 'id': eid})
+        replace_event_row(index)
+        invalidate_cache()
         flash("Event deleted successfully!", "success")
     else:
         flash("Event not found.", "danger")
@@ -276,7 +574,12 @@ def delete_event(index):
 # --- Run App ---
 
 if __name__ == '__main__':
+    # Compact the log on startup so it starts from one line per event
+    with event_log_lock():
+        events, line_count, fresh_ids = read_event_log()
+        if fresh_ids or line_count > len(events):
+            save_events(events)
     # Initial load of data and model before starting the server
-    GLOBAL_EVENTS = load_events()
-    GLOBAL_VECTORIZER, GLOBAL_MATRIX = get_ai_components(GLOBAL_EVENTS)
+    check_initialization()
+    ensure_ai_components()
     app.run(debug=True)